@@ -9,6 +9,11 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
 from io import BytesIO
 from flask import jsonify
+from markupsafe import Markup
+from jinja2 import meta as jinja2_meta
+from collections import namedtuple, OrderedDict
+import gzip
+import threading
 import warnings
 import base64
 import matplotlib.pyplot as plt
@@ -32,11 +37,30 @@ app.config['MYSQL_PORT'] = config.MYSQL_PORT
 app.config['MYSQL_USER'] = config.MYSQL_USER
 app.config['MYSQL_PASSWORD'] = config.MYSQL_PASSWORD
 app.config['MYSQL_DB'] = config.MYSQL_DB
+app.config['GZIP_RESULTS'] = config.GZIP_RESULTS
+app.config['RESULTS_CARD_CACHE_BYTES'] = config.RESULTS_CARD_CACHE_BYTES
 mail = Mail(app)
 warnings.filterwarnings("ignore", category=Warning)
 
 DATASET_FILENAMES = ["dataset.csv", "zomato.csv"]
+# Optional path to a CSV that takes priority over DATASET_FILENAMES (used by benchmark.py)
+DATASET_PATH_ENV = "FOOD_FINDER_DATASET"
+# Set to "1" to turn on GZIP_RESULTS without editing config.py (used by benchmark.py)
+GZIP_RESULTS_ENV = "FOOD_FINDER_GZIP_RESULTS"
+if os.environ.get(GZIP_RESULTS_ENV) == "1":
+    app.config['GZIP_RESULTS'] = True
 selected_dataset_path = None
+numeric_columns = ['cost', 'id', 'rating']
+# Marks where cached restaurant cards are spliced into results.html / filtered_results.html
+RESTAURANT_CARDS_PLACEHOLDER = '<!--restaurant-cards-->'
+# Whether each page template's source outputs {{ restaurant_cards }}, decided once per template
+template_uses_cards_cache = {}
+# Everything the routes read from one load of the dataset, swapped in a single assignment
+DatasetVersion = namedtuple('DatasetVersion', [
+    'frame', 'scaled_data', 'pca_model',
+    'rating_values', 'city_values', 'cost_values',
+    'card_cache',
+])
 
 
 def load_dataset() -> pd.DataFrame:
@@ -45,9 +69,17 @@ def load_dataset() -> pd.DataFrame:
     global selected_dataset_path
     base_dir = Path(__file__).resolve().parent
     attempted_paths = []
+    candidate_paths = [base_dir / file_name for file_name in DATASET_FILENAMES]
+    if os.environ.get(DATASET_PATH_ENV):
+        # An explicit override must not silently fall back to a different dataset
+        override_path = Path(os.environ[DATASET_PATH_ENV])
+        if not override_path.exists():
+            raise FileNotFoundError(
+                f"{DATASET_PATH_ENV} is set but {override_path} does not exist"
+            )
+        candidate_paths = [override_path]
 
-    for file_name in DATASET_FILENAMES:
-        dataset_path = base_dir / file_name
+    for dataset_path in candidate_paths:
         attempted_paths.append(dataset_path)
         if not dataset_path.exists():
             continue
@@ -66,40 +98,171 @@ def load_dataset() -> pd.DataFrame:
     )
 
 
-# Try to optionally load dataset from MySQL when configured. Falls back to CSV files.
-if app.config.get('USE_MYSQL'):
-    try:
-        from db import init_db, fetch_restaurants_df
-        init_db(app)
-        raw_data = fetch_restaurants_df()
-    except Exception as e:
-        print("MySQL load failed, falling back to CSV:", e)
+class RestaurantCardCache:
+    """Rendered card HTML keyed by DataFrame index, evicting least recently used cards
+    once the total size passes max_bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._cards = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        """Return the cached card (or None) for each key."""
+        cards = []
+        with self._lock:
+            for key in keys:
+                card = self._cards.get(key)
+                if card is not None:
+                    self._cards.move_to_end(key)
+                cards.append(card)
+        return cards
+
+    def put(self, key, card):
+        if len(card) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._cards.pop(key, None)
+            if previous is not None:
+                self.size_bytes -= len(previous)
+            self._cards[key] = card
+            self.size_bytes += len(card)
+            while self.size_bytes > self.max_bytes:
+                _, evicted = self._cards.popitem(last=False)
+                self.size_bytes -= len(evicted)
+
+
+def reload_dataset():
+    """(Re)load restaurant data and everything derived from it, with an empty card cache.
+
+    Routes only read `current_dataset`, which is replaced in one assignment at the end.
+    This runs once at import, i.e. at process start (in the gunicorn master with
+    --preload), so cached cards are only invalidated when the server restarts; calling
+    it again affects only the calling process.
+    """
+    global current_dataset
+
+    # Try to optionally load dataset from MySQL when configured. Falls back to CSV files.
+    if app.config.get('USE_MYSQL') and not os.environ.get(DATASET_PATH_ENV):
+        try:
+            from db import init_db, fetch_restaurants_df
+            init_db(app)
+            raw_data = fetch_restaurants_df()
+        except Exception as e:
+            print("MySQL load failed, falling back to CSV:", e)
+            raw_data = load_dataset()
+    else:
+        # Load from CSV as before
         raw_data = load_dataset()
-else:
-    # Load from CSV as before
-    raw_data = load_dataset()
-raw_data_frame = pd.DataFrame(raw_data)
-raw_data_frame['rating'] = pd.to_numeric(raw_data_frame['rating'], errors='coerce')
-raw_data_frame.dropna(inplace=True)
-label_encoder = LabelEncoder()
-food_rating_encoded = label_encoder.fit_transform(raw_data_frame['rating'])
-numeric_columns = ['cost', 'id', 'rating']
-numeric_data = raw_data_frame[numeric_columns]
+    # Build the new frame locally so routes never see a half-prepared one
+    frame = pd.DataFrame(raw_data)
+    frame['rating'] = pd.to_numeric(frame['rating'], errors='coerce')
+    frame.dropna(inplace=True)
+    label_encoder = LabelEncoder()
+    food_rating_encoded = label_encoder.fit_transform(frame['rating'])
+    numeric_data = frame[numeric_columns]
+
+    for column in numeric_columns:
+        numeric_data[column] = pd.to_numeric(numeric_data[column], errors='coerce')
+
+    numeric_data.dropna(inplace=True)
+    data_scaler = StandardScaler()
+    scaled_data = data_scaler.fit_transform(numeric_data)
+
+    pca_model = PCA(n_components=2)
+    pca_model.fit(scaled_data)
+
+    # Card HTML is rendered lazily and cached (within a byte budget) for this frame only
+    current_dataset = DatasetVersion(
+        frame=frame,
+        scaled_data=scaled_data,
+        pca_model=pca_model,
+        # Sample data for dropdowns
+        rating_values=sorted(frame['rating'].unique(), reverse=True),
+        city_values=sorted(frame['city'].unique(), reverse=False),
+        cost_values=sorted(frame['cost'].unique(), reverse=False),
+        card_cache=RestaurantCardCache(app.config['RESULTS_CARD_CACHE_BYTES']),
+    )
 
-for column in numeric_columns:
-    numeric_data[column] = pd.to_numeric(numeric_data[column], errors='coerce')
 
-numeric_data.dropna(inplace=True)
-data_scaler = StandardScaler()
-scaled_data_frame = data_scaler.fit_transform(numeric_data)
+reload_dataset()
 
-pca_model = PCA(n_components=2)
-pca_model.fit(scaled_data_frame)
 
-# Sample data for dropdowns
-rating_values = sorted(raw_data_frame['rating'].unique(), reverse=True)
-city_values = sorted(raw_data_frame['city'].unique(), reverse=False)
-cost_values = sorted(raw_data_frame['cost'].unique(), reverse=False)
+def restaurant_record(row):
+    """Template-ready dict for one restaurant row."""
+    return {
+        "name": str(row.get('name', '')),
+        "rating": float(row.get('rating', 0)),
+        "city": str(row.get('city', '')),
+        "cost": float(row.get('cost', 0)),
+        "cuisine": str(row.get('cuisine', '')),
+        "address": str(row.get('address', '')),
+        "link": str(row.get('link', ''))
+    }
+
+
+def restaurant_cards(filtered_data, card_cache):
+    """Return the card HTML (utf-8 bytes) for each row, rendering only rows not cached yet."""
+    cards = card_cache.get_many(filtered_data.index)
+    missing = [position for position, card in enumerate(cards) if card is None]
+    if missing:
+        card_template = app.jinja_env.get_template('_restaurant_card.html')
+        rows = filtered_data.iloc[missing]
+        for position, idx, row in zip(missing, rows.index, rows.to_dict('records')):
+            card = card_template.render(restaurant=restaurant_record(row)).encode('utf-8')
+            card_cache.put(idx, card)
+            cards[position] = card
+    return cards
+
+
+def template_uses_cards(template_name):
+    """True if the template's own source references restaurant_cards, in any branch."""
+    if template_name not in template_uses_cards_cache:
+        source, _, _ = app.jinja_env.loader.get_source(app.jinja_env, template_name)
+        variables = jinja2_meta.find_undeclared_variables(app.jinja_env.parse(source))
+        uses_cards = 'restaurant_cards' in variables
+        if not uses_cards:
+            print(f"{template_name} does not output {{{{ restaurant_cards }}}}; "
+                  "passing the restaurant list instead of cached cards")
+        template_uses_cards_cache[template_name] = uses_cards
+    return template_uses_cards_cache[template_name]
+
+
+def render_results_page(template_name, list_name, filtered_data, card_cache, **context):
+    """Render the page shell once and splice in the cached restaurant cards.
+
+    Templates that do not use {{ restaurant_cards }} get the restaurant list as
+    `list_name` instead, as they did before the card cache.
+    """
+    if template_uses_cards(template_name):
+        page = render_template(template_name,
+                               restaurant_cards=Markup(RESTAURANT_CARDS_PLACEHOLDER),
+                               restaurant_count=len(filtered_data),
+                               **context)
+        head, placeholder, tail = page.partition(RESTAURANT_CARDS_PLACEHOLDER)
+        if placeholder:
+            cards = restaurant_cards(filtered_data, card_cache)
+            body = b''.join([head.encode('utf-8'), *cards, tail.encode('utf-8')])
+        else:
+            # The branch that outputs the cards was not taken (e.g. no results)
+            body = page.encode('utf-8')
+    else:
+        restaurants = [restaurant_record(row) for row in filtered_data.to_dict('records')]
+        page = render_template(template_name,
+                               restaurant_count=len(restaurants),
+                               **{list_name: restaurants},
+                               **context)
+        body = page.encode('utf-8')
+
+    response = Response(body, mimetype='text/html')
+    response.vary.add('Accept-Encoding')
+    # Accept.__contains__ ignores quality, so "gzip;q=0" must be checked explicitly
+    if app.config.get('GZIP_RESULTS') and request.accept_encodings['gzip'] > 0:
+        response.set_data(gzip.compress(body, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
 
 @app.route('/')
 def home(): 
@@ -111,7 +274,8 @@ def homes():
 
 @app.route('/explore')
 def explore():
-    return render_template('explore.html', rating_values=rating_values, city_values=city_values, cost_values=cost_values)
+    dataset = current_dataset
+    return render_template('explore.html', rating_values=dataset.rating_values, city_values=dataset.city_values, cost_values=dataset.cost_values)
 
 @app.route('/process_data', methods=['POST'])
 def process_data():
@@ -121,33 +285,28 @@ def process_data():
         max_cost = float(request.form.get('max_cost'))
         selected_classifier = request.form.get('selected_classifier')
 
-        filtered_data = raw_data_frame[(raw_data_frame['rating'] >= min_rating) &
-                                       (raw_data_frame['city'] == selected_city) &
-                                       (raw_data_frame['cost'] <= max_cost)]
+        # Filter, run PCA and render cards from the same dataset version
+        dataset = current_dataset
+        restaurants_df = dataset.frame
+        filtered_data = restaurants_df[(restaurants_df['rating'] >= min_rating) &
+                                       (restaurants_df['city'] == selected_city) &
+                                       (restaurants_df['cost'] <= max_cost)]
 
         if not filtered_data.empty:
             # Apply PCA
             pca = PCA(n_components=2)  
-            pca_data = pca.fit_transform(scaled_data_frame)
+            pca_data = pca.fit_transform(dataset.scaled_data)
 
             # Transform filtered data using PCA
             filtered_pca_data = pca.transform(filtered_data[numeric_columns])
-            filtered_pca_results = []
-            for i, row in enumerate(filtered_data.iterrows()):
-                filtered_pca_results.append({
-                    "name": row[1]['name'],
-                    "rating": row[1]['rating'],
-                    "city": row[1]['city'],
-                    "cost": row[1]['cost'],
-                    "cuisine": row[1]['cuisine'],
-                    "address": row[1]['address'],
-                    "link": row[1]['link'],
-                })
-
-            return render_template('filtered_results.html', filtered_results=filtered_pca_results)
+
+            return render_results_page('filtered_results.html', 'filtered_results',
+                                       filtered_data, dataset.card_cache)
 
         else:
-            return render_template('filtered_results.html', filtered_results=[], selected_classifier=selected_classifier)
+            return render_results_page('filtered_results.html', 'filtered_results',
+                                       filtered_data, dataset.card_cache,
+                                       selected_classifier=selected_classifier)
     except Exception as e:
         return jsonify({"error": str(e)})
 
@@ -173,7 +332,7 @@ def download_pdf():
     max_cost = request.args.get('max_cost', type=float)
     
     # Start with all restaurants
-    filtered_data = raw_data_frame.copy()
+    filtered_data = current_dataset.frame.copy()
     
     # Apply filters
     if min_rating is not None:
@@ -311,8 +470,9 @@ def show_results():
     selected_city = request.args.get('selected_city', type=str)
     max_cost = request.args.get('max_cost', type=float)
     
-    # Start with all restaurants
-    filtered_data = raw_data_frame.copy()
+    # Start with all restaurants; cards come from the same dataset version
+    dataset = current_dataset
+    filtered_data = dataset.frame.copy()
     
     # Apply filters
     if min_rating is not None:
@@ -324,23 +484,10 @@ def show_results():
     if max_cost is not None:
         filtered_data = filtered_data[filtered_data['cost'] <= max_cost]
     
-    # Convert to list of dictionaries
-    restaurants = []
-    for idx, row in filtered_data.iterrows():
-        restaurants.append({
-            "name": str(row.get('name', '')),
-            "rating": float(row.get('rating', 0)),
-            "city": str(row.get('city', '')),
-            "cost": float(row.get('cost', 0)),
-            "cuisine": str(row.get('cuisine', '')),
-            "address": str(row.get('address', '')),
-            "link": str(row.get('link', ''))
-        })
-    
-    # Sort by rating (highest first)
-    restaurants.sort(key=lambda x: x['rating'], reverse=True)
+    # Sort by rating (highest first); stable so ties keep dataset order
+    filtered_data = filtered_data.sort_values('rating', ascending=False, kind='stable')
     
-    return render_template('results.html', restaurants=restaurants)
+    return render_results_page('results.html', 'restaurants', filtered_data, dataset.card_cache)
 
 @app.route('/map_only', methods=['GET'])
 def map_only():
@@ -376,7 +523,7 @@ def get_restaurants():
         max_cost = request.args.get('max_cost', type=float)
         
         # Start with all restaurants
-        filtered_data = raw_data_frame.copy()
+        filtered_data = current_dataset.frame.copy()
         
         # Apply search filter if provided
         if search_query:
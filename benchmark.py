@@ -0,0 +1,564 @@
+"""
+Load-test and regression benchmark for Food Finder routes.
+
+Generates synthetic restaurant datasets with the same columns as the
+`restaurants` table in create_db_table.py, then exercises the main routes
+through the Flask test client and through a multi-worker gunicorn server.
+Throughput, p50/p95/p99 latency, peak memory and startup time are written to a
+JSON baseline; later runs fail when any metric regresses past the threshold.
+A run in which any request fails is never saved or compared.
+
+Memory metrics: `peak_rss_mb` (test client) is the peak RSS of the single
+benchmark process. For the server, `peak_worker_rss_mb` is the peak RSS of the
+largest single process among gunicorn and the workers it reaped (not a total),
+and `peak_total_pss_mb` is the highest sampled sum of proportional set size over
+gunicorn and all its workers, so pages shared after fork are split rather than
+counted once per worker. The latter needs Linux /proc and is omitted elsewhere.
+
+Usage:
+    python benchmark.py --save                     # run and write benchmark_baseline.json
+    python benchmark.py                            # run and compare against the baseline
+    python benchmark.py --sizes 10000 100000       # only some dataset sizes
+    python benchmark.py --no-server                # Flask test client only
+
+Requires a POSIX system (uses the `resource` module) and gunicorn for the
+server phase.
+"""
+import argparse
+import json
+import math
+import os
+import resource
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = BASE_DIR / "bench_data"
+BASELINE_PATH = BASE_DIR / "benchmark_baseline.json"
+DATASET_PATH_ENV = "FOOD_FINDER_DATASET"  # must match app.DATASET_PATH_ENV
+GZIP_RESULTS_ENV = "FOOD_FINDER_GZIP_RESULTS"  # must match app.GZIP_RESULTS_ENV
+
+DATASET_SIZES = [10_000, 100_000, 1_000_000, 5_000_000]
+
+# Mix of cities known to app.get_city_coordinates plus one it does not know,
+# so radius/bounds filters see both hits and misses.
+BENCH_CITIES = [
+    'Vijayawada', 'Guntur', 'Visakhapatnam', 'Tirupati', 'Nellore',
+    'Hyderabad', 'Bangalore', 'Chennai', 'Mumbai', 'Delhi', 'Pune',
+    'Governorpet,Vijayawada', 'Koramangala,Bangalore', 'Madhapur,Hyderabad',
+    'Unknown Town',
+]
+BENCH_CUISINES = [
+    'North Indian', 'South Indian', 'Chinese', 'Biryani', 'Fast Food',
+    'Desserts', 'Italian', 'Andhra', 'Cafe', 'Street Food',
+]
+
+FILTER_PARAMS = {'min_rating': 4.0, 'selected_city': 'Vijayawada', 'max_cost': 800}
+# (name, method, path, query or form data, expected response kind)
+ROUTE_CASES = [
+    ('api_search', 'GET', '/api/restaurants', {'search': 'biryani'}, 'json'),
+    ('api_radius', 'GET', '/api/restaurants',
+     {'lat': 16.5062, 'lng': 80.6480, 'radius': 50}, 'json'),
+    ('api_bounds', 'GET', '/api/restaurants',
+     {'lat_min': 12.0, 'lat_max': 20.0, 'lng_min': 72.0, 'lng_max': 84.0}, 'json'),
+    ('api_filters', 'GET', '/api/restaurants', FILTER_PARAMS, 'json'),
+    ('results', 'GET', '/results', FILTER_PARAMS, 'html'),
+    ('results_gzip', 'GET', '/results', FILTER_PARAMS, 'html_gzip'),
+    ('process_data', 'POST', '/process_data',
+     dict(FILTER_PARAMS, selected_classifier='pca'), 'html'),
+    ('download_pdf', 'GET', '/download_pdf', FILTER_PARAMS, 'pdf'),
+]
+EXPECTED_CONTENT_TYPES = {
+    'json': 'application/json',
+    'html': 'text/html',
+    'html_gzip': 'text/html',
+    'pdf': 'application/pdf',
+}
+
+# Metrics where a larger value is better; every other metric is "lower is better".
+HIGHER_IS_BETTER = ('throughput_rps',)
+# Differences smaller than these are treated as noise regardless of the threshold.
+NOISE_FLOOR = {'_ms': 1.0, '_s': 0.05, '_mb': 5.0, '_rps': 1.0}
+# Tail percentiles are only gated when the run had enough samples to estimate them;
+# with nearest-rank and fewer samples p99 is just the slowest request.
+MIN_SAMPLES_TO_GATE = {'p95_ms': 20, 'p99_ms': 100}
+# Run settings that must match the baseline for a comparison to mean anything.
+COMPARED_META = ('requests', 'warmup', 'workers', 'concurrency')
+# Seconds to wait for gunicorn to exit after SIGTERM before sending SIGKILL.
+SERVER_STOP_TIMEOUT = 30.0
+# Seconds between samples of the gunicorn process tree's memory.
+MEMORY_SAMPLE_INTERVAL = 0.25
+
+
+def generate_dataset(rows, seed=42):
+    """Write a synthetic restaurants CSV with `rows` rows and return its path.
+
+    Files are cached in bench_data/ so repeated runs compare like with like.
+    """
+    DATA_DIR.mkdir(exist_ok=True)
+    dataset_path = DATA_DIR / f"restaurants_{rows}_{seed}.csv"
+    if dataset_path.exists():
+        return dataset_path
+
+    rng = np.random.default_rng(seed)
+    ids = pd.Series(np.arange(1, rows + 1)).astype(str)
+    cities = pd.Series(rng.choice(BENCH_CITIES, rows))
+    df = pd.DataFrame({
+        'id': ids,
+        'name': "Restaurant " + ids,
+        'rating': np.round(rng.uniform(1.0, 5.0, rows), 1),
+        'city': cities,
+        'cost': rng.choice(np.arange(100, 2100, 50), rows).astype(float),
+        'cuisine': rng.choice(BENCH_CUISINES, rows),
+        'address': pd.Series(rng.integers(1, 500, rows)).astype(str) + ", Main Road, " + cities,
+        'link': "https://www.zomato.com/restaurant/" + ids,
+    })
+
+    tmp_path = dataset_path.with_suffix('.tmp')
+    df.to_csv(tmp_path, index=False)
+    tmp_path.replace(dataset_path)
+    return dataset_path
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies, wall_time, errors):
+    """Build the per-route metric dict from latencies in seconds."""
+    latencies_ms = sorted(latency * 1000.0 for latency in latencies)
+    return {
+        'throughput_rps': round(len(latencies) / wall_time, 3) if wall_time else 0.0,
+        'p50_ms': round(percentile(latencies_ms, 50), 3),
+        'p95_ms': round(percentile(latencies_ms, 95), 3),
+        'p99_ms': round(percentile(latencies_ms, 99), 3),
+        'errors': errors,
+    }
+
+
+def request_headers(expect):
+    """Only the html_gzip cases ask for a gzipped response."""
+    return {'Accept-Encoding': 'gzip'} if expect == 'html_gzip' else {}
+
+
+def response_ok(expect, status, content_type, body, content_encoding=None):
+    """True for a real success, not an error page or a 200 carrying {"error": ...}."""
+    if status >= 400 or content_type != EXPECTED_CONTENT_TYPES[expect] or not body:
+        return False
+    if expect == 'html_gzip':
+        return content_encoding == 'gzip'
+    if expect == 'json':
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return False
+        return isinstance(payload, dict) and 'error' not in payload
+    return True
+
+
+def max_rss_mb(usage):
+    """ru_maxrss is KiB on Linux and bytes on macOS."""
+    if sys.platform == 'darwin':
+        return round(usage.ru_maxrss / (1024 * 1024), 1)
+    return round(usage.ru_maxrss / 1024, 1)
+
+
+def run_client(dataset_path, num_requests, warmup):
+    """Import the app against `dataset_path` and time each route through the test client.
+
+    Runs inside a fresh subprocess so startup time and peak RSS are per dataset.
+    """
+    os.environ[DATASET_PATH_ENV] = str(dataset_path)
+    os.environ[GZIP_RESULTS_ENV] = '1'
+    sys.path.insert(0, str(BASE_DIR))
+
+    start = time.perf_counter()
+    import app as food_finder
+    startup_s = time.perf_counter() - start
+
+    client = food_finder.app.test_client()
+    routes = {}
+    for name, method, path, params, expect in ROUTE_CASES:
+        headers = request_headers(expect)
+
+        def send():
+            if method == 'POST':
+                return client.post(path, data=params, headers=headers)
+            return client.get(path, query_string=params, headers=headers)
+
+        for _ in range(warmup):
+            send()
+
+        latencies = []
+        errors = 0
+        wall_start = time.perf_counter()
+        for _ in range(num_requests):
+            request_start = time.perf_counter()
+            response = send()
+            latencies.append(time.perf_counter() - request_start)
+            if not response_ok(expect, response.status_code, response.mimetype,
+                               response.get_data(), response.headers.get('Content-Encoding')):
+                errors += 1
+        routes[name] = summarize(latencies, time.perf_counter() - wall_start, errors)
+
+    return {
+        'startup_s': round(startup_s, 3),
+        'peak_rss_mb': max_rss_mb(resource.getrusage(resource.RUSAGE_SELF)),
+        'routes': routes,
+    }
+
+
+def fetch(url, method, params, expect, timeout):
+    """Send one HTTP request and return (latency in seconds, ok)."""
+    encoded = urllib.parse.urlencode(params)
+    headers = request_headers(expect)
+    if method == 'POST':
+        req = urllib.request.Request(url, data=encoded.encode(), headers=headers, method='POST')
+    else:
+        req = urllib.request.Request(f"{url}?{encoded}", headers=headers)
+
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            body = response.read()
+            ok = response_ok(expect, response.status, response.headers.get_content_type(), body,
+                             response.headers.get('Content-Encoding'))
+    except (urllib.error.URLError, OSError):
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def reap(proc, block):
+    """Reap `proc` with wait4 and return its rusage, or None if it is still running."""
+    pid, status, usage = os.wait4(proc.pid, 0 if block else os.WNOHANG)
+    if pid == 0:
+        return None
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return usage
+
+
+def stop_server(proc):
+    """SIGTERM gunicorn, SIGKILL it after SERVER_STOP_TIMEOUT, and return its rusage once reaped."""
+    os.kill(proc.pid, signal.SIGTERM)
+    deadline = time.perf_counter() + SERVER_STOP_TIMEOUT
+    while time.perf_counter() < deadline:
+        usage = reap(proc, block=False)
+        if usage is not None:
+            return usage
+        time.sleep(0.1)
+    os.kill(proc.pid, signal.SIGKILL)
+    return reap(proc, block=True)
+
+
+def process_tree_pss_mb(pid):
+    """Sum Pss over `pid` and its direct children from /proc, or None if unavailable."""
+    try:
+        children = Path(f'/proc/{pid}/task/{pid}/children').read_text().split()
+    except OSError:
+        return None
+
+    total_kb = 0
+    for process_id in [pid, *(int(child) for child in children)]:
+        try:
+            rollup = Path(f'/proc/{process_id}/smaps_rollup').read_text()
+        except OSError:
+            # Worker exited between listing and reading, or smaps_rollup is unsupported
+            continue
+        for line in rollup.splitlines():
+            if line.startswith('Pss:'):
+                total_kb += int(line.split()[1])
+                break
+    return round(total_kb / 1024, 1)
+
+
+def sample_peak_memory(pid, stop_event, peak):
+    """Record the highest process_tree_pss_mb() in peak['mb'] until stop_event is set."""
+    while not stop_event.is_set():
+        sample = process_tree_pss_mb(pid)
+        if sample is not None:
+            peak['mb'] = max(peak.get('mb', 0.0), sample)
+        stop_event.wait(MEMORY_SAMPLE_INTERVAL)
+
+
+def port_open(port):
+    """True once something accepts TCP connections on 127.0.0.1:`port`."""
+    try:
+        with socket.create_connection(('127.0.0.1', port), timeout=1.0):
+            return True
+    except OSError:
+        return False
+
+
+def run_server(dataset_path, num_requests, warmup, workers, concurrency, port, timeout):
+    """Start gunicorn with `workers` workers and load-test each route over HTTP."""
+    env = dict(os.environ, **{DATASET_PATH_ENV: str(dataset_path), GZIP_RESULTS_ENV: '1'})
+    command = [
+        sys.executable, '-m', 'gunicorn',
+        '--workers', str(workers),
+        '--bind', f'127.0.0.1:{port}',
+        '--timeout', str(int(timeout)),
+        '--preload',
+        'app:app',
+    ]
+    base_url = f'http://127.0.0.1:{port}'
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, cwd=BASE_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # The process is only ever reaped through wait4 (never Popen.poll/wait) so that its
+    # rusage, which covers gunicorn and the workers it reaped, is not lost.
+    usage = None
+    stop_sampling = threading.Event()
+    peak_memory = {}
+    sampler = threading.Thread(target=sample_peak_memory,
+                               args=(proc.pid, stop_sampling, peak_memory), daemon=True)
+    sampler.start()
+    try:
+        # With --preload the socket is only bound once the dataset has loaded, so a TCP
+        # connect is enough and no route time is counted as startup.
+        while True:
+            usage = reap(proc, block=False)
+            if usage is not None:
+                raise RuntimeError(f"gunicorn exited with code {proc.returncode} during startup")
+            if time.perf_counter() - start > timeout:
+                raise RuntimeError(f"gunicorn did not start within {timeout}s")
+            if port_open(port):
+                break
+            time.sleep(0.1)
+        startup_s = time.perf_counter() - start
+
+        routes = {}
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for name, method, path, params, expect in ROUTE_CASES:
+                url = base_url + path
+                list(pool.map(lambda _: fetch(url, method, params, expect, timeout), range(warmup)))
+
+                wall_start = time.perf_counter()
+                outcomes = list(pool.map(lambda _: fetch(url, method, params, expect, timeout),
+                                         range(num_requests)))
+                wall_time = time.perf_counter() - wall_start
+                routes[name] = summarize([latency for latency, _ in outcomes], wall_time,
+                                         sum(1 for _, ok in outcomes if not ok))
+    finally:
+        stop_sampling.set()
+        sampler.join()
+        if usage is None:
+            usage = stop_server(proc)
+
+    metrics = {
+        'startup_s': round(startup_s, 3),
+        'peak_worker_rss_mb': max_rss_mb(usage),
+        'routes': routes,
+    }
+    if 'mb' in peak_memory:
+        metrics['peak_total_pss_mb'] = peak_memory['mb']
+    return metrics
+
+
+def run_client_subprocess(dataset_path, num_requests, warmup):
+    """Run run_client() in a fresh interpreter and return its metrics."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = Path(tmp_dir) / 'client.json'
+        subprocess.run(
+            [sys.executable, __file__, '--client', str(dataset_path),
+             '--client-output', str(output_path),
+             '--requests', str(num_requests), '--warmup', str(warmup)],
+            cwd=BASE_DIR, check=True, stdout=subprocess.DEVNULL,
+        )
+        return json.loads(output_path.read_text())
+
+
+def flatten_metrics(results, prefix=''):
+    """Flatten nested results into {"10000.server.routes.results.p95_ms": value}."""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_metrics(value, path + '.'))
+        elif isinstance(value, (int, float)):
+            flat[path] = value
+    return flat
+
+
+def failing_routes(results):
+    """Return a line for every route case that had any failed request."""
+    return [
+        f"{size}.{phase}.routes.{name}: {metrics['errors']} failed request(s)"
+        for size, size_results in results['sizes'].items()
+        for phase, phase_results in size_results.items()
+        for name, metrics in phase_results['routes'].items()
+        if metrics['errors']
+    ]
+
+
+def find_mismatches(baseline, current):
+    """Return (problems, warnings) about what cannot be compared between the two runs.
+
+    Problems are differing run settings and metrics present on only one side for a
+    dataset size that was run; warnings are baseline sizes this run skipped.
+    """
+    problems = []
+    warnings = []
+
+    for key in COMPARED_META:
+        base_value = baseline['meta'].get(key)
+        current_value = current['meta'].get(key)
+        if base_value != current_value:
+            problems.append(f"meta.{key}: baseline {base_value}, this run {current_value}")
+
+    for size, size_results in current['sizes'].items():
+        if size not in baseline['sizes']:
+            problems.append(f"{size}: not in baseline")
+            continue
+        baseline_keys = set(flatten_metrics(baseline['sizes'][size], f"{size}."))
+        current_keys = set(flatten_metrics(size_results, f"{size}."))
+        problems.extend(f"{key}: missing from this run" for key in sorted(baseline_keys - current_keys))
+        problems.extend(f"{key}: missing from baseline" for key in sorted(current_keys - baseline_keys))
+
+    warnings.extend(f"{size}: in baseline but not run" for size in baseline['sizes']
+                    if size not in current['sizes'])
+    return problems, warnings
+
+
+def find_regressions(baseline, current, threshold):
+    """Return a human-readable line for every metric that got worse than `threshold`."""
+    baseline_flat = flatten_metrics(baseline['sizes'])
+    current_flat = flatten_metrics(current['sizes'])
+    samples = current['meta']['requests']
+    regressions = []
+
+    for key, current_value in sorted(current_flat.items()):
+        if key not in baseline_flat:
+            continue
+        base_value = baseline_flat[key]
+        metric = key.rsplit('.', 1)[-1]
+        if samples < MIN_SAMPLES_TO_GATE.get(metric, 0):
+            continue
+
+        if metric == 'errors':
+            if current_value > base_value:
+                regressions.append(f"{key}: {base_value} -> {current_value} errors")
+            continue
+
+        noise = next((floor for suffix, floor in NOISE_FLOOR.items() if metric.endswith(suffix)), 0.0)
+        if metric in HIGHER_IS_BETTER:
+            worse = current_value < base_value * (1 - threshold) and base_value - current_value > noise
+        else:
+            worse = current_value > base_value * (1 + threshold) and current_value - base_value > noise
+        if worse:
+            change = (current_value - base_value) / base_value * 100 if base_value else float('inf')
+            regressions.append(f"{key}: {base_value} -> {current_value} ({change:+.1f}%)")
+
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Food Finder load-test and regression benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DATASET_SIZES,
+                        help="dataset row counts to benchmark")
+    parser.add_argument('--requests', type=int, default=100, help="timed requests per route")
+    parser.add_argument('--warmup', type=int, default=2, help="untimed requests per route")
+    parser.add_argument('--workers', type=int, default=4, help="gunicorn worker processes")
+    parser.add_argument('--concurrency', type=int, default=8, help="concurrent HTTP clients")
+    parser.add_argument('--port', type=int, default=5055, help="port for the gunicorn server")
+    parser.add_argument('--timeout', type=float, default=600.0,
+                        help="seconds to wait for server startup and each request")
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help="allowed relative regression per metric (0.15 = 15%%)")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH, help="baseline JSON file")
+    parser.add_argument('--save', action='store_true', help="write results as the new baseline")
+    parser.add_argument('--no-server', action='store_true', help="skip the gunicorn phase")
+    # Internal: used by run_client_subprocess()
+    parser.add_argument('--client', type=Path, help=argparse.SUPPRESS)
+    parser.add_argument('--client-output', type=Path, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.client:
+        metrics = run_client(args.client, args.requests, args.warmup)
+        args.client_output.write_text(json.dumps(metrics))
+        return 0
+
+    results = {
+        'meta': {
+            'python': sys.version.split()[0],
+            'platform': sys.platform,
+            'requests': args.requests,
+            'warmup': args.warmup,
+            'workers': args.workers,
+            'concurrency': args.concurrency,
+        },
+        'sizes': {},
+    }
+
+    for rows in args.sizes:
+        print(f"[{rows} rows] generating dataset")
+        dataset_path = generate_dataset(rows)
+
+        print(f"[{rows} rows] Flask test client")
+        size_results = {'client': run_client_subprocess(dataset_path, args.requests, args.warmup)}
+
+        if not args.no_server:
+            print(f"[{rows} rows] gunicorn x{args.workers}")
+            size_results['server'] = run_server(dataset_path, args.requests, args.warmup,
+                                                args.workers, args.concurrency,
+                                                args.port, args.timeout)
+        results['sizes'][str(rows)] = size_results
+
+    failures = failing_routes(results)
+    if failures:
+        print(f"Requests failed in {len(failures)} route case(s); their timings are not "
+              "meaningful, so nothing was saved or compared:")
+        for line in failures:
+            print("  " + line)
+        return 1
+
+    if args.save or not args.baseline.exists():
+        args.baseline.write_text(json.dumps(results, indent=2) + '\n')
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    problems, warnings = find_mismatches(baseline, results)
+    for line in warnings:
+        print("WARNING: " + line)
+    if problems:
+        print(f"Cannot compare against {args.baseline} ({len(problems)} mismatch(es)); "
+              "rerun with the same settings or --save a new baseline:")
+        for line in problems:
+            print("  " + line)
+        return 1
+
+    regressions = find_regressions(baseline, results, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed more than {args.threshold:.0%}:")
+        for line in regressions:
+            print("  " + line)
+        return 1
+
+    print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
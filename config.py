@@ -31,6 +31,8 @@ MAIL_DEFAULT_SENDER = 'your_email@gmail.com'  # Same as MAIL_USERNAME
 # ============================================================================
 SECRET_KEY = 'replace-this-with-a-strong-random-secret-key'  # Change this to a random string
 DEBUG = False
+GZIP_RESULTS = False  # Gzip /results and /process_data pages when the browser accepts it (measure with benchmark.py first)
+RESULTS_CARD_CACHE_BYTES = 64 * 1024 * 1024  # Max rendered restaurant card HTML kept per worker process
 
 # ============================================================================
 # DATA STORAGE INFORMATION